@@ -2,6 +2,7 @@ from flask import Flask, request, abort
 import os
 import json
 import tempfile
+import numpy as np
 import pandas as pd
 from linebot import LineBotApi, WebhookHandler
 from linebot.exceptions import InvalidSignatureError
@@ -14,6 +15,8 @@ from dotenv import load_dotenv
 import logging
 import datetime
 import re
+import threading
+from collections import OrderedDict, namedtuple
 from io import StringIO
 
 # Setup logging
@@ -40,7 +43,8 @@ app = Flask(__name__)
 LINE_CHANNEL_SECRET = os.environ.get('LINE_CHANNEL_SECRET', 'your_line_channel_secret')
 LINE_CHANNEL_ACCESS_TOKEN = os.environ.get('LINE_CHANNEL_ACCESS_TOKEN', 'your_line_channel_access_token')
 
-line_bot_api = LineBotApi(LINE_CHANNEL_ACCESS_TOKEN)
+# WebhookHandler hanya memverifikasi signature dan mendispatch event (tanpa koneksi),
+# sehingga aman dibuat saat import. LineBotApi dibuat per proses lewat get_line_bot_api().
 handler = WebhookHandler(LINE_CHANNEL_SECRET)
 
 # Konfigurasi Dify API
@@ -51,6 +55,41 @@ DIFY_API_ENDPOINT = os.environ.get('DIFY_API_ENDPOINT', 'https://api.dify.ai/v1/
 GOOGLE_DRIVE_CREDENTIALS_FILE = os.environ.get('GOOGLE_DRIVE_CREDENTIALS_FILE', 'credentials.json')
 GOOGLE_DRIVE_FOLDER_ID = os.environ.get('GOOGLE_DRIVE_FOLDER_ID', 'your_google_drive_folder_id')
 
+# Client Line milik proses ini (lihat get_line_bot_api)
+_line_bot_api = None
+_line_bot_api_pid = None
+
+# Batas Line Messaging API untuk satu panggilan reply
+LINE_MAX_TEXT_LENGTH = 5000
+LINE_MAX_MESSAGES_PER_REPLY = 5
+
+# Jumlah layout tabel yang rencana parsing-nya disimpan (LRU)
+PARSE_PLAN_CACHE_SIZE = int(os.environ.get('PARSE_PLAN_CACHE_SIZE', '32'))
+
+# Rencana parsing untuk satu layout tabel: delimiter, nama kolom, dan tipe data tiap kolom (urut kolom)
+ParsePlan = namedtuple('ParsePlan', ['delimiter', 'columns', 'dtypes'])
+
+# Tabel rata spasi ("No  Nama Siswa  UH") dipisah oleh dua spasi atau lebih
+SPACE_ALIGNED_DELIMITER = r'\s{2,}'
+TABLE_DELIMITERS = ['|', '\t', ',', ';', SPACE_ALIGNED_DELIMITER]
+
+_parse_plan_cache = OrderedDict()
+_parse_plan_lock = threading.Lock()
+
+
+def get_line_bot_api():
+    """
+    Mengembalikan client LineBotApi milik proses ini.
+    Client dibuat saat pertama kali dipakai dan dibuat ulang setelah fork,
+    sehingga tidak ada koneksi yang dibagi antar worker.
+    """
+    global _line_bot_api, _line_bot_api_pid
+    if _line_bot_api is None or _line_bot_api_pid != os.getpid():
+        _line_bot_api = LineBotApi(LINE_CHANNEL_ACCESS_TOKEN)
+        _line_bot_api_pid = os.getpid()
+        logger.info(f"Client Line Bot dibuat untuk proses {_line_bot_api_pid}")
+    return _line_bot_api
+
 
 def create_drive_service():
     """Membuat layanan Google Drive API."""
@@ -215,6 +254,26 @@ def callback():
     return 'OK'
 
 
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness check: proses masih berjalan."""
+    return {'status': 'ok', 'pid': os.getpid()}
+
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness check: konfigurasi Line dan Dify sudah diisi (bukan nilai contoh)."""
+    placeholders = {
+        'LINE_CHANNEL_SECRET': (LINE_CHANNEL_SECRET, 'your_line_channel_secret'),
+        'LINE_CHANNEL_ACCESS_TOKEN': (LINE_CHANNEL_ACCESS_TOKEN, 'your_line_channel_access_token'),
+        'DIFY_API_KEY': (DIFY_API_KEY, 'your_dify_api_key'),
+    }
+    missing = [name for name, (value, placeholder) in placeholders.items() if value == placeholder]
+    if missing:
+        return {'status': 'not_ready', 'missing': missing}, 503
+    return {'status': 'ready'}
+
+
 def extract_table_from_text(text):
     """
     Mengekstrak tabel dari teks respons.
@@ -302,6 +361,170 @@ def clean_table_text(table_text):
     return processed_text, delimiter
 
 
+def header_key(header_line):
+    """Menormalkan baris header (spasi dirapatkan) untuk dipakai sebagai kunci cache layout."""
+    return re.sub(r'\s+', ' ', header_line.strip())
+
+
+def get_parse_plan(key):
+    """Mengambil rencana parsing dari cache dan menandainya sebagai yang terbaru dipakai."""
+    with _parse_plan_lock:
+        plan = _parse_plan_cache.get(key)
+        if plan is not None:
+            _parse_plan_cache.move_to_end(key)
+        return plan
+
+
+def store_parse_plan(key, plan):
+    """Menyimpan rencana parsing ke cache, membuang layout yang paling lama tidak dipakai."""
+    with _parse_plan_lock:
+        _parse_plan_cache[key] = plan
+        _parse_plan_cache.move_to_end(key)
+        while len(_parse_plan_cache) > PARSE_PLAN_CACHE_SIZE:
+            _parse_plan_cache.popitem(last=False)
+
+
+def split_table_row(line, delimiter):
+    """Memecah satu baris tabel menjadi sel berdasarkan delimiter."""
+    line = line.strip()
+    if delimiter == '|':
+        return [cell.strip() for cell in line.strip('|').split('|')]
+    if delimiter == SPACE_ALIGNED_DELIMITER:
+        return re.split(delimiter, line)
+    return [cell.strip() for cell in line.split(delimiter)]
+
+
+def is_separator_row(cells):
+    """Baris pemisah Markdown seperti ---|:---:|---."""
+    return all(re.fullmatch(r':?-+:?', cell) for cell in cells)
+
+
+def numeric_cells(cells):
+    """Menandai sel mana saja yang berisi angka."""
+    return [bool(re.fullmatch(r'-?[\d.,]+', cell)) for cell in cells]
+
+
+def is_table_header(columns, first_row):
+    """
+    Header tabel minimal punya 2 kolom tanpa sel kosong, dan baris data pertama
+    punya jumlah kolom yang sama tetapi pola sel angkanya berbeda. Dengan begitu
+    kalimat biasa yang kebetulan berisi koma tidak dianggap header.
+    """
+    if len(columns) < 2 or '' in columns or len(first_row) != len(columns):
+        return False
+    return numeric_cells(columns) != numeric_cells(first_row)
+
+
+def detect_table_header(lines):
+    """
+    Mencari baris header tabel dan rencana parsing-nya.
+    Layout yang sudah ada di cache diperiksa lebih dulu; jika tidak ada, baris pembuka
+    atau judul dilewati sampai ditemukan header yang cocok dengan baris data pertama.
+    Mengembalikan (indeks header, ParsePlan) atau (None, None).
+    """
+    # Layout yang sudah dikenal hanya dipakai jika nama kolomnya sama persis
+    for i, line in enumerate(lines):
+        if not line.strip():
+            continue
+        plan = get_parse_plan(header_key(line))
+        if plan and split_table_row(line, plan.delimiter) == list(plan.columns):
+            logger.info("Layout tabel dikenali dari cache")
+            return i, plan
+    
+    for i, line in enumerate(lines):
+        if not line.strip() or line.rstrip().endswith(':'):
+            continue
+        for delimiter in TABLE_DELIMITERS:
+            columns = split_table_row(line, delimiter)
+            if len(columns) < 2:
+                continue
+            first_row = next(
+                (row for row in (split_table_row(l, delimiter) for l in lines[i + 1:] if l.strip())
+                 if not is_separator_row(row)),
+                []
+            )
+            if is_table_header(columns, first_row):
+                return i, ParsePlan(delimiter=delimiter, columns=tuple(columns), dtypes=None)
+    return None, None
+
+
+def slice_table_rows(lines, plan):
+    """
+    Memotong baris data tabel sesuai rencana parsing.
+    Baris pemisah Markdown (---|---) dilewati. Mengembalikan None jika ada baris
+    yang jumlah kolomnya tidak cocok dengan header.
+    """
+    rows = []
+    for line in lines:
+        if not line.strip():
+            continue
+        row = split_table_row(line, plan.delimiter)
+        if is_separator_row(row):
+            continue
+        if len(row) != len(plan.columns):
+            return None
+        rows.append(row)
+    return rows or None
+
+
+def infer_column_dtype(values):
+    """Mengubah isi kolom menjadi array int64, float64, atau object (teks)."""
+    for dtype in ('int64', 'float64'):
+        try:
+            return np.array(values, dtype=dtype)
+        except (ValueError, OverflowError):
+            continue
+    return np.array(values, dtype=object)
+
+
+def build_table_frame(rows, plan):
+    """
+    Menyusun DataFrame langsung dari baris yang sudah dipotong, kolom per kolom.
+    Jika rencana sudah punya tipe data, setiap kolom dikonversi sekali tanpa tebakan.
+    Mengembalikan (DataFrame, tipe data tiap kolom).
+    """
+    data = {}
+    dtypes = []
+    for index, values in enumerate(zip(*rows)):
+        if plan.dtypes is not None:
+            array = np.array(values, dtype=plan.dtypes[index])
+        else:
+            array = infer_column_dtype(values)
+        data[index] = array
+        dtypes.append(array.dtype.name)
+    df = pd.DataFrame(data)
+    df.columns = list(plan.columns)
+    return df, tuple(dtypes)
+
+
+def parse_table_with_plan(table_text):
+    """
+    Memparsing tabel dengan rencana parsing dari cache atau hasil deteksi header.
+    Rencana baru disimpan ke cache setelah semua baris data cocok dengan header.
+    Mengembalikan None jika header tabel tidak dapat dideteksi.
+    """
+    lines = table_text.strip().split('\n')
+    header_index, plan = detect_table_header(lines)
+    if plan is None:
+        return None
+    
+    rows = slice_table_rows(lines[header_index + 1:], plan)
+    if rows is None:
+        return None
+    
+    if plan.dtypes is not None:
+        try:
+            df, _ = build_table_frame(rows, plan)
+            return df
+        except (ValueError, OverflowError):
+            logger.info("Tipe data tidak cocok dengan cache, mendeteksi ulang")
+            plan = plan._replace(dtypes=None)
+    
+    df, dtypes = build_table_frame(rows, plan)
+    store_parse_plan(header_key(lines[header_index]), plan._replace(dtypes=dtypes))
+    return df
+
+
 def create_csv_from_table(table_text, filename="data.csv"):
     """
     Membuat file CSV dari teks tabel.
@@ -309,16 +532,19 @@ def create_csv_from_table(table_text, filename="data.csv"):
     try:
         if not table_text:
             return None
-            
-        # Bersihkan tabel
-        clean_text, delimiter = clean_table_text(table_text)
         
-        # Konversi ke DataFrame berdasarkan delimiter
-        if delimiter == '|':
-            df = pd.read_csv(StringIO(clean_text), sep='|')
-        else:
-            # Coba deteksi delimiter otomatis
-            df = pd.read_csv(StringIO(clean_text), sep=None, engine='python')
+        df = parse_table_with_plan(table_text)
+        
+        if df is None:
+            # Bersihkan tabel
+            clean_text, delimiter = clean_table_text(table_text)
+            
+            # Konversi ke DataFrame berdasarkan delimiter
+            if delimiter == '|':
+                df = pd.read_csv(StringIO(clean_text), sep='|')
+            else:
+                # Coba deteksi delimiter otomatis
+                df = pd.read_csv(StringIO(clean_text), sep=None, engine='python')
         
         # Simpan ke file CSV
         temp_dir = tempfile.gettempdir()
@@ -332,6 +558,101 @@ def create_csv_from_table(table_text, filename="data.csv"):
         return None
 
 
+def line_text_length(text):
+    """Menghitung panjang teks seperti Line, yaitu dalam unit UTF-16 (emoji dihitung 2)."""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def split_by_line_length(text, limit):
+    """Memotong teks menjadi potongan yang masing-masing paling panjang limit unit UTF-16."""
+    pieces = []
+    start = 0
+    length = 0
+    for i, char in enumerate(text):
+        size = 2 if ord(char) > 0xFFFF else 1
+        if length + size > limit:
+            pieces.append(text[start:i])
+            start = i
+            length = 0
+        length += size
+    pieces.append(text[start:])
+    return pieces
+
+
+def iter_text_segments(text, limit=LINE_MAX_TEXT_LENGTH):
+    """
+    Memecah teks menjadi segmen (pemisah, isi, panjang) yang masing-masing muat dalam satu pesan.
+    Pemecahan dilakukan per paragraf (sehingga tabel tetap utuh), lalu per baris,
+    dan terakhir dipotong paksa jika satu baris masih melebihi batas.
+    """
+    for i, paragraph in enumerate(text.split('\n\n')):
+        separator = '\n\n' if i > 0 else ''
+        length = line_text_length(paragraph)
+        if length <= limit:
+            yield separator, paragraph, length
+            continue
+        for j, line in enumerate(paragraph.split('\n')):
+            if j > 0:
+                separator = '\n'
+            for piece in split_by_line_length(line, limit):
+                yield separator, piece, line_text_length(piece)
+                separator = ''
+
+
+def pack_messages(text, footer=None, limit=LINE_MAX_TEXT_LENGTH, max_messages=LINE_MAX_MESSAGES_PER_REPLY):
+    """
+    Menyusun teks panjang menjadi beberapa pesan Line (maksimal max_messages).
+    Panjang setiap pesan dihitung dalam satu kali lintasan; footer (misalnya link CSV)
+    selalu ikut terkirim di pesan terakhir. Teks kosong menghasilkan daftar kosong.
+    """
+    chunks = []
+    current = ''
+    current_length = 0
+    if text and text.strip():
+        for separator, segment, length in iter_text_segments(text, limit):
+            if current and current_length + len(separator) + length <= limit:
+                current += separator + segment
+                current_length += len(separator) + length
+            else:
+                if current:
+                    chunks.append(current)
+                # Segmen yang hanya berisi spasi tidak dijadikan awal pesan baru
+                current = segment if segment.strip() else ''
+                current_length = length if current else 0
+
+    if footer:
+        footer_length = line_text_length(footer)
+        if current and current_length + 2 + footer_length <= limit:
+            current += '\n\n' + footer
+        else:
+            if current:
+                chunks.append(current)
+            current = footer
+    if current:
+        chunks.append(current)
+
+    if len(chunks) > max_messages:
+        logger.warning(f"Respons membutuhkan {len(chunks)} pesan, dipotong menjadi {max_messages} pesan")
+        chunks = chunks[:max_messages]
+        tail = f"...\n\n{footer}" if footer else "..."
+        chunks[-1] = split_by_line_length(chunks[-1], limit - line_text_length(tail))[0] + tail
+
+    return chunks
+
+
+def reply_text(reply_token, text, footer=None):
+    """Mengirim teks (beserta footer opsional) sebagai satu atau beberapa pesan dalam satu reply."""
+    chunks = pack_messages(text, footer)
+    if not chunks:
+        logger.warning("Respons kosong, mengirim pesan default")
+        chunks = ["Maaf, saya tidak dapat memproses permintaan Anda saat ini."]
+    logger.info(f"Mengirim respons dalam {len(chunks)} pesan")
+    get_line_bot_api().reply_message(
+        reply_token,
+        [TextSendMessage(text=chunk) for chunk in chunks]
+    )
+
+
 @handler.add(MessageEvent, message=TextMessage)
 def handle_message(event):
     """Menangani pesan dari pengguna."""
@@ -364,21 +685,13 @@ def handle_message(event):
                 file_link = upload_to_drive(csv_file_path, f"data_requested_by_{user_id}.csv")
                 logger.info(f"File berhasil diunggah. Link: {file_link}")
                 
-                # Kirim pesan dengan respons asli dan link
-                combined_response = f"{answer}\n\nFile CSV dapat diunduh di: {file_link}"
+                footer = f"File CSV dapat diunduh di: {file_link}"
+                
+                # Jika tidak muat dalam satu pesan, tabel cukup dikirim lewat file CSV
+                if line_text_length(answer) + 2 + line_text_length(footer) > LINE_MAX_TEXT_LENGTH:
+                    answer = answer.replace(table_text, "(Tabel lengkap tersedia di file CSV)")
                 
-                # Jika terlalu panjang, potong respons dan tambahkan link
-                if len(combined_response) > 4000:  # Batas karakter message Line
-                    shortened_response = f"{answer[:3500]}...\n\nFile CSV dapat diunduh di: {file_link}"
-                    line_bot_api.reply_message(
-                        event.reply_token,
-                        TextSendMessage(text=shortened_response)
-                    )
-                else:
-                    line_bot_api.reply_message(
-                        event.reply_token,
-                        TextSendMessage(text=combined_response)
-                    )
+                reply_text(event.reply_token, answer, footer)
                 
                 # Hapus file temporary
                 os.remove(csv_file_path)
@@ -386,33 +699,29 @@ def handle_message(event):
                 return
             else:
                 # Jika gagal membuat CSV, kirim respons normal dengan pesan error
-                line_bot_api.reply_message(
+                reply_text(
                     event.reply_token,
-                    TextSendMessage(text=f"{answer}\n\nMaaf, tidak dapat menghasilkan file CSV dari data.")
+                    answer,
+                    "Maaf, tidak dapat menghasilkan file CSV dari data."
                 )
                 return
         else:
             # Jika tidak ada tabel yang ditemukan, kirim respons normal
-            line_bot_api.reply_message(
-                event.reply_token,
-                TextSendMessage(text=answer)
-            )
+            reply_text(event.reply_token, answer)
             return
     
     # Jika bukan permintaan data atau tidak ada tabel, kirim respons normal
     if 'answer' in dify_response:
         logger.info("Mengirim respons normal dari Dify")
-        line_bot_api.reply_message(
-            event.reply_token,
-            TextSendMessage(text=dify_response['answer'])
-        )
+        reply_text(event.reply_token, dify_response['answer'])
     else:
         logger.error("Tidak ada respons dari Dify atau terjadi error")
-        line_bot_api.reply_message(
+        get_line_bot_api().reply_message(
             event.reply_token,
             TextSendMessage(text="Maaf, saya tidak dapat memproses permintaan Anda saat ini.")
         )
 
 
 if __name__ == '__main__':
+    # Server development; untuk produksi gunakan: gunicorn -c gunicorn.conf.py app:app
     app.run(debug=True, port=5000) 
\ No newline at end of file
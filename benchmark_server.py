@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark jumlah request per detik server produksi untuk beberapa jumlah worker.
+Setiap jumlah worker dijalankan sebagai proses Gunicorn terpisah, lalu endpoint
+/callback dibanjiri webhook bertanda tangan valid tanpa event (sehingga Dify,
+Line, dan Google Drive tidak ikut dipanggil).
+"""
+
+import argparse
+import base64
+import hashlib
+import hmac
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LINE_CHANNEL_SECRET = os.environ.get('LINE_CHANNEL_SECRET', 'your_line_channel_secret')
+
+
+def sign_body(body):
+    """Membuat X-Line-Signature untuk body webhook."""
+    digest = hmac.new(LINE_CHANNEL_SECRET.encode('utf-8'), body.encode('utf-8'), hashlib.sha256).digest()
+    return base64.b64encode(digest).decode('utf-8')
+
+
+def wait_until_ready(base_url, timeout=30):
+    """Menunggu /healthz mengembalikan 200."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{base_url}/healthz", timeout=1).status_code == 200:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def run_load(base_url, duration, concurrency):
+    """Mengirim webhook secara paralel selama duration detik dan mengembalikan (sukses, gagal)."""
+    body = '{"destination": "benchmark", "events": []}'
+    headers = {'Content-Type': 'application/json', 'X-Line-Signature': sign_body(body)}
+    counts = {'ok': 0, 'error': 0}
+    lock = threading.Lock()
+    deadline = time.time() + duration
+
+    def worker():
+        session = requests.Session()
+        ok = error = 0
+        while time.time() < deadline:
+            try:
+                response = session.post(f"{base_url}/callback", data=body, headers=headers, timeout=10)
+                if response.status_code == 200:
+                    ok += 1
+                else:
+                    error += 1
+            except requests.RequestException:
+                error += 1
+        with lock:
+            counts['ok'] += ok
+            counts['error'] += error
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return counts['ok'], counts['error']
+
+
+def benchmark(worker_count, port, duration, concurrency):
+    """Menjalankan Gunicorn dengan worker_count worker dan mengukur request per detik."""
+    env = dict(os.environ, WEB_CONCURRENCY=str(worker_count), PORT=str(port))
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app'],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        if not wait_until_ready(base_url):
+            raise RuntimeError(f"Server dengan {worker_count} worker tidak siap")
+        ok, error = run_load(base_url, duration, concurrency)
+    finally:
+        server.terminate()
+        server.wait()
+    return ok / duration, error
+
+
+def main():
+    """Fungsi utama untuk menjalankan benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark request/detik per jumlah worker')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Daftar jumlah worker yang diuji')
+    parser.add_argument('--duration', type=int, default=10, help='Durasi pengujian per jumlah worker (detik)')
+    parser.add_argument('--concurrency', type=int, default=16, help='Jumlah koneksi paralel')
+    parser.add_argument('--port', type=int, default=5055, help='Port server saat benchmark')
+    args = parser.parse_args()
+
+    print("| Worker | Request/detik | Gagal |")
+    print("|--------|---------------|-------|")
+    for worker_count in args.workers:
+        rps, error = benchmark(worker_count, args.port, args.duration, args.concurrency)
+        print(f"| {worker_count} | {rps:.1f} | {error} |")
+
+
+if __name__ == "__main__":
+    main()
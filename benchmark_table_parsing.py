@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark waktu parsing tabel: cara lama (clean_table_text + pandas.read_csv),
+parsing pertama tanpa cache layout, dan parsing berikutnya dengan cache layout.
+"""
+
+import argparse
+import json
+import logging
+import timeit
+from io import StringIO
+
+import pandas as pd
+
+import app
+from app import extract_table_from_text, clean_table_text, parse_table_with_plan
+
+SAMPLE_FILES = [
+    'sample_dify_response.json',
+    'sample_response_with_table.json',
+    'sample_response_table_format2.json',
+]
+
+
+def baseline_parse(table_text):
+    """Cara parsing sebelum ada cache layout."""
+    clean_text, delimiter = clean_table_text(table_text)
+    if delimiter == '|':
+        return pd.read_csv(StringIO(clean_text), sep='|')
+    return pd.read_csv(StringIO(clean_text), sep=None, engine='python')
+
+
+def cold_parse(table_text):
+    """Parsing dengan cache kosong (deteksi header dan tipe data)."""
+    app._parse_plan_cache.clear()
+    return parse_table_with_plan(table_text)
+
+
+def pipe_table(row_count):
+    """Membuat tabel Markdown dengan row_count baris data."""
+    lines = ["| No | Nama Siswa | UH | Tugas | UTS | UAS | Nilai Akhir |", "|---|---|---|---|---|---|---|"]
+    for i in range(1, row_count + 1):
+        lines.append(f"| {i} | Siswa {i} | {70 + i % 30} | {75 + i % 20} | {80 + i % 15} | {85 + i % 10} | {78.5 + i % 7} |")
+    return '\n'.join(lines)
+
+
+def measure(func, table_text, number):
+    """Waktu terbaik per panggilan dalam milidetik, atau "gagal" jika tabel tidak dapat diparsing."""
+    try:
+        func(table_text)
+    except Exception:
+        return "gagal"
+    best = min(timeit.repeat(lambda: func(table_text), number=number, repeat=5))
+    return f"{best / number * 1000:.3f}"
+
+
+def main():
+    """Fungsi utama untuk menjalankan benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark parsing tabel dengan dan tanpa cache layout')
+    parser.add_argument('--number', type=int, default=200, help='Jumlah parsing per pengukuran')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+
+    tables = []
+    for path in SAMPLE_FILES:
+        with open(path, 'r', encoding='utf-8') as f:
+            tables.append((path, extract_table_from_text(json.load(f)['answer'])))
+    tables.append(("pipe 10 baris", pipe_table(10)))
+    tables.append(("pipe 200 baris", pipe_table(200)))
+
+    print("| Tabel | Cara lama (ms) | Tanpa cache (ms) | Dengan cache (ms) |")
+    print("|-------|----------------|------------------|-------------------|")
+    for name, table_text in tables:
+        baseline = measure(baseline_parse, table_text, args.number)
+        cold = measure(cold_parse, table_text, args.number)
+        parse_table_with_plan(table_text)
+        cached = measure(parse_table_with_plan, table_text, args.number)
+        print(f"| {name} | {baseline} | {cold} | {cached} |")
+
+
+if __name__ == "__main__":
+    main()
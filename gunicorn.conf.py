@@ -0,0 +1,39 @@
+"""
+Konfigurasi Gunicorn untuk menjalankan bot di produksi.
+
+Jalankan dengan:
+    gunicorn -c gunicorn.conf.py app:app
+
+Semua nilai dapat diatur lewat variabel lingkungan (lihat env.template).
+"""
+
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+# Konfigurasi ini dibaca sebelum app.py dimuat, jadi .env perlu dimuat di sini juga
+load_dotenv()
+
+bind = os.environ.get('BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+
+# Multi-proses: default mengikuti rekomendasi Gunicorn (2 x CPU + 1)
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+# handle_message menunggu Dify dan Google Drive, jadi timeout dibuat longgar
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+
+# Saat SIGTERM, worker berhenti menerima koneksi baru dan menunggu permintaan
+# yang sedang berjalan (termasuk handle_message) selesai hingga batas ini
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '60'))
+keepalive = 5
+
+# Aplikasi dimuat sekali di master lalu di-fork; aman karena client Line
+# dibuat per proses secara lazy (lihat get_line_bot_api di app.py)
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+
@@ -0,0 +1,49 @@
+from app import pack_messages, iter_text_segments, line_text_length, LINE_MAX_MESSAGES_PER_REPLY
+
+
+def test_segments_follow_paragraph_boundaries():
+    """Paragraf yang muat dikirim utuh, paragraf yang terlalu panjang dipecah per baris."""
+    text = "pembuka\n\nbaris 1\nbaris 2"
+    assert list(iter_text_segments(text, limit=100)) == [
+        ('', 'pembuka', 7),
+        ('\n\n', 'baris 1\nbaris 2', 15),
+    ]
+    assert [segment for _, segment, _ in iter_text_segments(text, limit=10)] == ['pembuka', 'baris 1', 'baris 2']
+
+
+def test_pack_keeps_paragraph_boundaries():
+    """Pesan dipisah di batas paragraf dan teks aslinya tetap utuh."""
+    text = "a" * 10 + "\n\n" + "b" * 10 + "\n\n" + "c" * 10
+    chunks = pack_messages(text, limit=25)
+    assert chunks == ["a" * 10 + "\n\n" + "b" * 10, "c" * 10]
+    assert pack_messages(text, limit=1000) == [text]
+
+
+def test_footer_is_placed_in_last_message():
+    """Footer digabung ke pesan terakhir jika muat, jika tidak dikirim sebagai pesan sendiri."""
+    assert pack_messages("jawaban", "LINK", limit=100) == ["jawaban\n\nLINK"]
+    assert pack_messages("x" * 20, "LINK", limit=20) == ["x" * 20, "LINK"]
+
+
+def test_five_message_cap_keeps_footer():
+    """Jumlah pesan dibatasi dan footer tetap ada di pesan terakhir."""
+    chunks = pack_messages("\n\n".join(["y" * 50] * 20), "LINK", limit=60)
+    assert len(chunks) == LINE_MAX_MESSAGES_PER_REPLY
+    assert chunks[-1].endswith("...\n\nLINK")
+    assert all(line_text_length(chunk) <= 60 for chunk in chunks)
+
+
+def test_length_is_counted_in_utf16_units():
+    """Emoji dihitung dua unit sehingga tidak melebihi batas Line."""
+    chunks = pack_messages("\U0001F600" * 4000)
+    assert len(chunks) == 2
+    assert all(line_text_length(chunk) <= 5000 for chunk in chunks)
+
+
+def test_empty_input_produces_no_messages():
+    """Teks kosong tidak menghasilkan pesan teks kosong."""
+    assert pack_messages("") == []
+    assert pack_messages("  \n\n ") == []
+    assert pack_messages("", "LINK") == ["LINK"]
+    assert pack_messages("a" * 5000 + "\n\n" + "   ") == ["a" * 5000]
+    assert pack_messages("a" * 5000 + "\n\n" + "   ", "LINK") == ["a" * 5000, "LINK"]
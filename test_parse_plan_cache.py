@@ -0,0 +1,70 @@
+import json
+
+import pandas as pd
+import pytest
+
+import app
+from app import extract_table_from_text, create_csv_from_table
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Setiap tes dimulai dengan cache layout kosong."""
+    app._parse_plan_cache.clear()
+    yield
+    app._parse_plan_cache.clear()
+
+
+def table_from_sample(path):
+    with open(path, 'r') as f:
+        return extract_table_from_text(json.load(f)['answer'])
+
+
+def read_csv_header(file_path):
+    return list(pd.read_csv(file_path).columns)
+
+
+def test_space_aligned_table_uses_cache_on_second_parse(monkeypatch):
+    """Tabel rata spasi (format2) diparsing dari cache pada respons berikutnya."""
+    table_text = table_from_sample('sample_response_table_format2.json')
+    assert create_csv_from_table(table_text, "test_format2.csv")
+    assert list(app._parse_plan_cache) == ['No Nama Siswa UH Tugas UTS UAS Nilai Akhir']
+
+    def fail(values):
+        raise AssertionError("deteksi tipe data seharusnya dilewati")
+    monkeypatch.setattr(app, 'infer_column_dtype', fail)
+
+    file_path = create_csv_from_table(table_text, "test_format2.csv")
+    assert read_csv_header(file_path) == ['No', 'Nama Siswa', 'UH', 'Tugas', 'UTS', 'UAS', 'Nilai Akhir']
+    assert len(pd.read_csv(file_path)) == 10
+
+
+def test_prose_lead_in_is_not_cached():
+    """Kalimat pembuka atau judul tidak disimpan sebagai header dan tidak merusak respons berikutnya."""
+    assert create_csv_from_table(table_from_sample('sample_dify_response.json'), "test_prose.csv")
+    assert create_csv_from_table(table_from_sample('sample_response_with_table.json'), "test_prose.csv")
+    assert 'Berikut adalah nilai matematika kelas 7:' not in app._parse_plan_cache
+    assert 'Daftar Nilai Matematika Kelas 7' not in app._parse_plan_cache
+
+    answer = "Berikut adalah nilai matematika kelas 7:\n\n| Nama | Nilai |\n| Andi | 80 |\n| Budi | 75 |"
+    file_path = create_csv_from_table(extract_table_from_text(answer), "test_prose.csv")
+    assert read_csv_header(file_path) == ['Nama', 'Nilai']
+
+
+def test_prose_with_comma_is_not_a_header():
+    """Kalimat dengan satu koma tidak dianggap header walaupun baris berikutnya juga dua kolom."""
+    df = app.parse_table_with_plan("Halo, ini data\nNama,Nilai\nAndi,80")
+    assert list(df.columns) == ['Nama', 'Nilai']
+    assert df.values.tolist() == [['Andi', 80]]
+    assert list(app._parse_plan_cache) == ['Nama,Nilai']
+
+
+def test_cached_plan_requires_matching_columns():
+    """Header spasi tunggal punya kunci cache yang sama dengan header rata spasi, tetapi tidak boleh memakai rencananya."""
+    aligned = "No  Nama Siswa  UH\n1   Andi        80\n2   Budi        75"
+    assert create_csv_from_table(aligned, "test_header.csv")
+    assert list(app._parse_plan_cache) == ['No Nama Siswa UH']
+
+    single_spaced = "No Nama Siswa UH\n1 Andi 80\n2 Budi 75"
+    assert app.header_key(single_spaced.split('\n')[0]) in app._parse_plan_cache
+    assert app.detect_table_header(single_spaced.split('\n')) == (None, None)
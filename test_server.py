@@ -0,0 +1,50 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def test_healthz_returns_ok(client):
+    """Liveness check selalu 200 selama proses berjalan."""
+    response = client.get('/healthz')
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'ok'
+
+
+def test_readyz_reports_placeholder_settings(client, monkeypatch):
+    """Readiness check gagal selama konfigurasi masih berisi nilai contoh."""
+    monkeypatch.setattr(app, 'LINE_CHANNEL_SECRET', 'your_line_channel_secret')
+    monkeypatch.setattr(app, 'LINE_CHANNEL_ACCESS_TOKEN', 'your_line_channel_access_token')
+    monkeypatch.setattr(app, 'DIFY_API_KEY', 'your_dify_api_key')
+
+    response = client.get('/readyz')
+    assert response.status_code == 503
+    assert response.get_json()['missing'] == ['LINE_CHANNEL_SECRET', 'LINE_CHANNEL_ACCESS_TOKEN', 'DIFY_API_KEY']
+
+
+def test_readyz_ready_when_configured(client, monkeypatch):
+    """Readiness check berhasil setelah konfigurasi diisi."""
+    monkeypatch.setattr(app, 'LINE_CHANNEL_SECRET', 'secret')
+    monkeypatch.setattr(app, 'LINE_CHANNEL_ACCESS_TOKEN', 'token')
+    monkeypatch.setattr(app, 'DIFY_API_KEY', 'key')
+
+    response = client.get('/readyz')
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'ready'
+
+
+def test_line_bot_api_is_created_per_process(monkeypatch):
+    """Client Line dipakai ulang dalam satu proses dan dibuat ulang setelah fork."""
+    monkeypatch.setattr(app, '_line_bot_api', None)
+    monkeypatch.setattr(app, '_line_bot_api_pid', None)
+
+    monkeypatch.setattr(app.os, 'getpid', lambda: 1000)
+    first = app.get_line_bot_api()
+    assert app.get_line_bot_api() is first
+
+    monkeypatch.setattr(app.os, 'getpid', lambda: 1001)
+    assert app.get_line_bot_api() is not first